@@ -66,6 +66,7 @@ rst_epilog = '''
 .. _requests-file: https://github.com/dashea/requests-file
 .. _Plex: https://www.plex.tv/
 .. _portalocker: https://portalocker.readthedocs.io
+.. _fping: https://fping.org/
 
 .. |project| replace:: {project}
 .. |project_bold| replace:: **{project}**
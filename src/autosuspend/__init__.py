@@ -2,6 +2,7 @@
 """A daemon to suspend a system on inactivity."""
 
 import argparse
+from concurrent.futures import as_completed, ThreadPoolExecutor
 import configparser
 import datetime
 import functools
@@ -10,7 +11,10 @@ import logging.config
 import os
 import os.path
 import pathlib
+import selectors
+import signal
 import subprocess
+import threading
 import time
 from typing import (
     Callable,
@@ -19,6 +23,7 @@ from typing import (
     List,
     Optional,
     Sequence,
+    Tuple,
     Type,
     TypeVar,
     Union,
@@ -54,6 +59,31 @@ def execute_suspend(
         _logger.warning("Unable to execute suspend command: %s", command, exc_info=True)
 
 
+class _WakeupTemplateFields(dict):
+    """Placeholder values for command templates about a scheduled wake up.
+
+    Values are only computed once a template actually references them.
+    """
+
+    def __init__(self, wakeup_at: datetime.datetime) -> None:
+        super().__init__()
+        self._wakeup_at = wakeup_at
+
+    def __missing__(self, key: str) -> Union[float, str]:
+        if key == "timestamp":
+            value = self._wakeup_at.timestamp()  # type: Union[float, str]
+        elif key == "iso":
+            value = self._wakeup_at.isoformat()
+        else:
+            raise KeyError(key)
+        self[key] = value
+        return value
+
+
+def _format_wakeup_template(template: str, wakeup_at: datetime.datetime) -> str:
+    return template.format_map(_WakeupTemplateFields(wakeup_at))
+
+
 def notify_suspend(
     command_wakeup_template: Optional[str],
     command_no_wakeup: Optional[str],
@@ -87,9 +117,7 @@ def notify_suspend(
             )
 
     if wakeup_at and command_wakeup_template:
-        command = command_wakeup_template.format(
-            timestamp=wakeup_at.timestamp(), iso=wakeup_at.isoformat()
-        )
+        command = _format_wakeup_template(command_wakeup_template, wakeup_at)
         safe_exec(command)
     elif not wakeup_at and command_no_wakeup:
         safe_exec(command_no_wakeup)
@@ -108,9 +136,7 @@ def notify_and_suspend(
 
 
 def schedule_wakeup(command_template: str, wakeup_at: datetime.datetime) -> None:
-    command = command_template.format(
-        timestamp=wakeup_at.timestamp(), iso=wakeup_at.isoformat()
-    )
+    command = _format_wakeup_template(command_template, wakeup_at)
     _logger.info("Scheduling wakeup using command: %s", command)
     try:
         subprocess.check_call(command, shell=True)  # noqa: S602
@@ -120,66 +146,107 @@ def schedule_wakeup(command_template: str, wakeup_at: datetime.datetime) -> None
         )
 
 
+def _execute_check(check: Activity, logger: logging.Logger) -> Optional[str]:
+    logger.debug("Executing check %s", check.name)
+    try:
+        return check.check()
+    except TemporaryCheckError:
+        logger.warning("Check %s failed. Ignoring...", check, exc_info=True)
+        return None
+
+
 def execute_checks(
     checks: Iterable[Activity], all_checks: bool, logger: logging.Logger
 ) -> bool:
-    """Execute the provided checks sequentially.
+    """Execute the provided checks in parallel.
+
+    Most checks spend their time waiting for external processes or network
+    replies. Running them concurrently bounds the time required for all
+    checks by the slowest one instead of the sum of all checks.
 
     Args:
         checks:
             the checks to execute
         all_checks:
-            if ``True``, execute all checks even if a previous one already
-            matched.
+            if ``True``, report the results of all checks even if a previous
+            one already matched.
 
     Return:
         ``True`` if a check matched
     """
+    checks = list(checks)
+    if not checks:
+        return False
+
     matched = False
-    for check in checks:
-        logger.debug("Executing check %s", check.name)
-        try:
-            result = check.check()
+    with ThreadPoolExecutor(max_workers=len(checks)) as executor:
+        futures = {
+            executor.submit(_execute_check, check, logger): check for check in checks
+        }
+        for future in as_completed(futures):
+            result = future.result()
             if result is not None:
-                logger.info("Check %s matched. Reason: %s", check.name, result)
+                logger.info(
+                    "Check %s matched. Reason: %s", futures[future].name, result
+                )
                 matched = True
                 if not all_checks:
-                    logger.debug("Skipping further checks")
+                    logger.debug("Skipping results of further checks")
                     break
-        except TemporaryCheckError:
-            logger.warning("Check %s failed. Ignoring...", check, exc_info=True)
     return matched
 
 
+def _execute_wakeup(
+    wakeup: Wakeup, timestamp: datetime.datetime, logger: logging.Logger
+) -> Optional[datetime.datetime]:
+    try:
+        this_at = wakeup.check(timestamp)
+    except TemporaryCheckError:
+        logger.warning("Wakeup %s failed. Ignoring...", wakeup, exc_info=True)
+        return None
+
+    # sanity checks
+    if this_at is not None and this_at <= timestamp:
+        logger.warning(
+            "Wakeup %s returned a scheduled wakeup at %s, "
+            "which is earlier than the current time %s. "
+            "Ignoring.",
+            wakeup,
+            this_at,
+            timestamp,
+        )
+        return None
+
+    return this_at
+
+
 def execute_wakeups(
     wakeups: Iterable[Wakeup], timestamp: datetime.datetime, logger: logging.Logger
 ) -> Optional[datetime.datetime]:
+    """Execute the provided wake up checks in parallel.
 
-    wakeup_at = None
-    for wakeup in wakeups:
-        try:
-            this_at = wakeup.check(timestamp)
-
-            # sanity checks
-            if this_at is None:
-                continue
-            if this_at <= timestamp:
-                logger.warning(
-                    "Wakeup %s returned a scheduled wakeup at %s, "
-                    "which is earlier than the current time %s. "
-                    "Ignoring.",
-                    wakeup,
-                    this_at,
-                    timestamp,
-                )
-                continue
+    Args:
+        wakeups:
+            the wake up checks to execute
+        timestamp:
+            the time to determine the next wake up for
+        logger:
+            the logger to use for reporting failures
+
+    Returns:
+        the earliest wake up time requested by any of the checks or ``None``
+    """
+    wakeups = list(wakeups)
+    if not wakeups:
+        return None
 
-            if wakeup_at is None:
+    wakeup_at = None
+    with ThreadPoolExecutor(max_workers=len(wakeups)) as executor:
+        for this_at in executor.map(
+            lambda wakeup: _execute_wakeup(wakeup, timestamp, logger), wakeups
+        ):
+            if this_at is not None and (wakeup_at is None or this_at < wakeup_at):
                 wakeup_at = this_at
-            else:
-                wakeup_at = min(this_at, wakeup_at)
-        except TemporaryCheckError:
-            logger.warning("Wakeup %s failed. Ignoring...", wakeup, exc_info=True)
 
     return wakeup_at
 
@@ -225,11 +292,12 @@ class Processor:
         all_activities: bool,
     ) -> None:
         self._logger = logger_by_class_instance(self)
-        self._activities = activities
-        self._wakeups = wakeups
-        self._idle_time = idle_time
-        self._min_sleep_time = min_sleep_time
-        self._wakeup_delta = wakeup_delta
+        # iterated in every iteration, freeze them once
+        self._activities = tuple(activities)
+        self._wakeups = tuple(wakeups)
+        self._idle_time = datetime.timedelta(seconds=idle_time)
+        self._min_sleep_time = datetime.timedelta(seconds=min_sleep_time)
+        self._wakeup_delta = datetime.timedelta(seconds=wakeup_delta)
         self._sleep_fn = sleep_fn
         self._wakeup_fn = wakeup_fn
         self._all_activities = all_activities
@@ -249,9 +317,7 @@ class Processor:
 
         # determine system activity
         active = execute_checks(self._activities, self._all_activities, self._logger)
-        self._logger.debug(
-            "All activity checks have been executed. " "Active: %s", active
-        )
+        self._logger.debug("All activity checks have been executed. Active: %s", active)
         if active:
             self._reset_state("System is active")
             return
@@ -263,17 +329,16 @@ class Processor:
         self._logger.info("System is idle since %s", self._idle_since)
 
         # determine if systems is idle long enough
-        self._logger.debug(
-            "Idle seconds: %s", (timestamp - self._idle_since).total_seconds()
-        )
-        if (timestamp - self._idle_since).total_seconds() > self._idle_time:
+        idle_for = timestamp - self._idle_since
+        self._logger.debug("Idle for: %s", idle_for)
+        if idle_for > self._idle_time:
             self._logger.info("System is idle long enough.")
 
             # determine potential wake ups
             wakeup_at = execute_wakeups(self._wakeups, timestamp, self._logger)
             if wakeup_at is not None:
                 self._logger.debug("System wakeup required at %s", wakeup_at)
-                wakeup_at -= datetime.timedelta(seconds=self._wakeup_delta)
+                wakeup_at -= self._wakeup_delta
                 self._logger.debug(
                     "With delta applied, system should wake up at %s", wakeup_at,
                 )
@@ -283,13 +348,13 @@ class Processor:
             # idle time would be reached, handle wake up
             if wakeup_at is not None:
                 wakeup_in = wakeup_at - timestamp
-                if wakeup_in.total_seconds() < self._min_sleep_time:
+                if wakeup_in < self._min_sleep_time:
                     self._logger.info(
                         "Would wake up in %s seconds, which is "
                         "below the minimum amount of %s s. "
                         "Not suspending.",
                         wakeup_in.total_seconds(),
-                        self._min_sleep_time,
+                        self._min_sleep_time.total_seconds(),
                     )
                     return
 
@@ -301,17 +366,49 @@ class Processor:
             self._sleep_fn(wakeup_at)
         else:
             self._logger.info(
-                "Desired idle time of %s s not reached yet.", self._idle_time
+                "Desired idle time of %s s not reached yet.",
+                self._idle_time.total_seconds(),
             )
 
 
+def _drain(fd: int) -> None:
+    """Consume all data currently available on a non-blocking file descriptor."""
+    try:
+        while os.read(fd, 512):
+            pass
+    except BlockingIOError:
+        pass
+
+
+def _sleep(seconds: float, wakeup_fd: Optional[int] = None) -> None:
+    """Sleep for the given time or until data arrives on ``wakeup_fd``.
+
+    Args:
+        seconds:
+            maximum time to sleep
+        wakeup_fd:
+            if specified, a non-blocking file descriptor that ends the sleep
+            early once it becomes readable. Available data is consumed.
+    """
+    if wakeup_fd is None:
+        time.sleep(seconds)
+        return
+
+    with selectors.DefaultSelector() as selector:
+        selector.register(wakeup_fd, selectors.EVENT_READ)
+        if selector.select(timeout=seconds):
+            _drain(wakeup_fd)
+
+
 def loop(
     processor: Processor,
     interval: float,
-    run_for: Optional[int],
+    run_for: Optional[float],
     woke_up_file: str,
     lock_file: str,
     lock_timeout: float,
+    reload_requested: Optional[threading.Event] = None,
+    wakeup_fd: Optional[int] = None,
 ) -> None:
     """Run the main loop of the daemon.
 
@@ -331,26 +428,33 @@ def loop(
             to ensure consistency
         lock_timeout:
             time in seconds to wait for acquiring the lock file
+        reload_requested:
+            if specified, terminate the main loop after the current iteration
+            as soon as this event is set
+        wakeup_fd:
+            if specified, a non-blocking file descriptor that interrupts the
+            sleep between iterations once it becomes readable
     """
 
-    start_time = datetime.datetime.now(datetime.timezone.utc)
-    while (run_for is None) or (
-        datetime.datetime.now(datetime.timezone.utc)
-        < (start_time + datetime.timedelta(seconds=run_for))
-    ):
+    # monotonic to be robust against changes of the system time
+    deadline = None if run_for is None else time.monotonic() + run_for
+    while deadline is None or time.monotonic() < deadline:
+
+        if reload_requested is not None and reload_requested.is_set():
+            _logger.debug("Reload requested, leaving main loop")
+            break
 
         try:
             _logger.debug("New iteration, trying to acquire lock")
             with portalocker.Lock(lock_file, timeout=lock_timeout):
                 _logger.debug("Acquired lock")
 
-                just_woke_up = os.path.isfile(woke_up_file)
-                if just_woke_up:
-                    _logger.debug("Removing woke up file at %s", woke_up_file)
-                    try:
-                        os.remove(woke_up_file)
-                    except FileNotFoundError:
-                        _logger.warning("Just woke up file disappeared", exc_info=True)
+                try:
+                    os.unlink(woke_up_file)
+                    _logger.debug("Removed woke up file at %s", woke_up_file)
+                    just_woke_up = True
+                except FileNotFoundError:
+                    just_woke_up = False
 
                 processor.iteration(
                     datetime.datetime.now(datetime.timezone.utc), just_woke_up
@@ -359,7 +463,7 @@ def loop(
         except portalocker.LockException:
             _logger.warning("Failed to acquire lock, skipping iteration", exc_info=True)
 
-        time.sleep(interval)
+        _sleep(interval, wakeup_fd)
 
 
 CheckType = TypeVar("CheckType", bound=Check)
@@ -395,18 +499,21 @@ def set_up_checks(
     """
     configured_checks = []  # type: List[CheckType]
 
-    check_section = [s for s in config.sections() if s.startswith("{}.".format(prefix))]
-    for section in check_section:
-        name = section[len("{}.".format(prefix)) :]
+    prefix_dot = f"{prefix}."
+    for section in config.sections():
+        if not section.startswith(prefix_dot):
+            continue
+        name = section[len(prefix_dot) :]
+        section_config = config[section]
         # legacy method to determine the check name from the section header
         class_name = name
         # if there is an explicit class, use that one with higher priority
-        if "class" in config[section]:
-            class_name = config[section]["class"]
-        enabled = config.getboolean(section, "enabled", fallback=False)
+        if "class" in section_config:
+            class_name = section_config["class"]
+        enabled = section_config.getboolean("enabled", fallback=False)
 
         if not enabled:
-            _logger.debug("Skipping disabled check {}".format(name))
+            _logger.debug("Skipping disabled check %s", name)
             continue
 
         # try to find the required class
@@ -415,7 +522,7 @@ def set_up_checks(
             import_module, import_class = class_name.rsplit(".", maxsplit=1)
         else:
             # no dot means internal class
-            import_module = "autosuspend.checks.{}".format(internal_module)
+            import_module = f"autosuspend.checks.{internal_module}"
             import_class = class_name
         _logger.info(
             "Configuring check %s with class %s from module %s "
@@ -423,7 +530,7 @@ def set_up_checks(
             name,
             import_class,
             import_module,
-            config_section_string(config[section]),
+            config_section_string(section_config),
         )
         try:
             klass = getattr(
@@ -435,7 +542,7 @@ def set_up_checks(
                 "Class does not exist".format(class_name)
             ) from error
 
-        check = klass.create(name, config[section])
+        check = klass.create(name, section_config)
         if not isinstance(check, target_class):
             raise ConfigurationError(
                 "Check {} is not a correct {} instance".format(
@@ -469,6 +576,30 @@ def parse_config(config_file: Iterable[str]) -> configparser.ConfigParser:
     return config
 
 
+def reload_config(
+    path: str, last_modified: Optional[float]
+) -> Tuple[Optional[configparser.ConfigParser], Optional[float]]:
+    """Parse the configuration file again in case it has been modified.
+
+    Args:
+        path:
+            path of the configuration file to read
+        last_modified:
+            modification time of the file at the time it was parsed the last
+            time
+
+    Returns:
+        A tuple of the new configuration and its modification time. The
+        configuration is ``None`` in case the file has not been modified.
+    """
+    modified = os.stat(path).st_mtime
+    if modified == last_modified:
+        _logger.debug("Config file %s has not been modified", path)
+        return None, last_modified
+    with open(path, "r") as config_file:
+        return parse_config(config_file), modified
+
+
 def parse_arguments(args: Optional[Sequence[str]]) -> argparse.Namespace:
     """Parse command line arguments.
 
@@ -530,8 +661,8 @@ def parse_arguments(args: Optional[Sequence[str]]) -> argparse.Namespace:
         dest="all_checks",
         default=False,
         action="store_true",
-        help="Execute all checks even if one has already prevented "
-        "the system from going to sleep. Useful to debug individual "
+        help="Report the results of all checks even if one has already "
+        "prevented the system from going to sleep. Useful to debug individual "
         "checks.",
     )
     parser_daemon.add_argument(
@@ -715,9 +846,14 @@ def main_hook(args: argparse.Namespace, config: configparser.ConfigParser) -> No
     )
 
 
-def main_daemon(args: argparse.Namespace, config: configparser.ConfigParser) -> None:
-    """Run the daemon."""
+def configure_daemon(
+    args: argparse.Namespace, config: configparser.ConfigParser
+) -> Tuple[Processor, float]:
+    """Set up the checks and the processor used by the daemon.
 
+    Returns:
+        A tuple of the processor and the interval of the main loop
+    """
     checks = set_up_checks(
         config,
         "check",
@@ -730,14 +866,82 @@ def main_daemon(args: argparse.Namespace, config: configparser.ConfigParser) ->
     )
 
     processor = configure_processor(args, config, checks, wakeups)
-    loop(
-        processor,
-        config.getfloat("general", "interval", fallback=60),
-        run_for=args.run_for,
-        woke_up_file=get_woke_up_file(config),
-        lock_file=get_lock_file(config),
-        lock_timeout=get_lock_timeout(config),
-    )
+    return processor, config.getfloat("general", "interval", fallback=60)
+
+
+def main_daemon(args: argparse.Namespace, config: configparser.ConfigParser) -> None:
+    """Run the daemon.
+
+    Sending ``SIGHUP`` to the daemon reloads the configuration file in case it
+    has been modified.
+    """
+
+    config_path = args.config_file.name
+    try:
+        last_modified = os.stat(config_path).st_mtime  # type: Optional[float]
+    except OSError:
+        last_modified = None
+
+    # self-pipe written to by the interpreter on signal arrival to interrupt
+    # the sleep of the loop
+    wakeup_read, wakeup_write = os.pipe()
+    os.set_blocking(wakeup_read, False)
+    os.set_blocking(wakeup_write, False)
+    previous_wakeup_fd = signal.set_wakeup_fd(wakeup_write)
+
+    reload_requested = threading.Event()
+
+    def request_reload(signum: int, frame: object) -> None:
+        reload_requested.set()
+
+    previous_sighup = signal.signal(signal.SIGHUP, request_reload)
+
+    try:
+        processor, interval = configure_daemon(args, config)
+        run_for = args.run_for
+        while True:
+            loop_start = time.monotonic()
+            loop(
+                processor,
+                interval,
+                run_for=run_for,
+                woke_up_file=get_woke_up_file(config),
+                lock_file=get_lock_file(config),
+                lock_timeout=get_lock_timeout(config),
+                reload_requested=reload_requested,
+                wakeup_fd=wakeup_read,
+            )
+
+            if not reload_requested.is_set():
+                break
+            reload_requested.clear()
+            _drain(wakeup_read)
+            if run_for is not None:
+                run_for -= time.monotonic() - loop_start
+
+            _logger.info("Reloading configuration from %s", config_path)
+            try:
+                new_config, last_modified = reload_config(config_path, last_modified)
+                if new_config is None:
+                    _logger.info("Configuration unchanged, keeping current state")
+                    continue
+                processor, interval = configure_daemon(args, new_config)
+                config = new_config
+            except Exception:
+                _logger.error(
+                    "Unable to reload the configuration. Keeping the previous one.",
+                    exc_info=True,
+                )
+    finally:
+        # None signals a handler not installed from Python, which cannot be
+        # restored
+        signal.signal(
+            signal.SIGHUP,
+            previous_sighup if previous_sighup is not None else signal.SIG_DFL,
+        )
+        signal.set_wakeup_fd(previous_wakeup_fd)
+        os.close(wakeup_read)
+        os.close(wakeup_write)
 
 
 def main(argv: Optional[Sequence[str]] = None) -> None:
@@ -1,16 +1,19 @@
+from concurrent.futures import as_completed, ThreadPoolExecutor
 import configparser
-import copy
 from datetime import datetime, timedelta, timezone
+import functools
 import glob
 from io import BytesIO
 import json
+import logging
 import os
 import pwd
 import re
+import shutil
 import socket
 import subprocess
 import time
-from typing import Any, Dict, Iterable, Optional, Pattern, Sequence, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Pattern, Sequence, Tuple
 import warnings
 
 import psutil
@@ -64,22 +67,26 @@ class ActiveConnection(Activity):
 
     def __init__(self, name: str, ports: Iterable[int]) -> None:
         Activity.__init__(self, name)
-        self._ports = ports
+        self._ports = frozenset(ports)
 
     def check(self) -> Optional[str]:
-        own_addresses = [
+        # Only TCP sockets have an ESTABLISHED state. Let psutil skip the UDP
+        # and UNIX socket tables right away.
+        candidates = [
+            c
+            for c in psutil.net_connections(kind="tcp")
+            if c.status == "ESTABLISHED" and c.laddr[1] in self._ports
+        ]
+        if not candidates:
+            return None
+
+        own_addresses = {
             (item.family, item.address.split("%")[0])
             for sublist in psutil.net_if_addrs().values()
             for item in sublist
-        ]
+        }
         connected = [
-            c.laddr[1]
-            for c in psutil.net_connections()
-            if (
-                (c.family, c.laddr[0]) in own_addresses
-                and c.status == "ESTABLISHED"
-                and c.laddr[1] in self._ports
-            )
+            c.laddr[1] for c in candidates if (c.family, c.laddr[0]) in own_addresses
         ]
         if connected:
             return "Ports {} are connected".format(connected)
@@ -231,17 +238,42 @@ class Mpd(Activity):
         self._host = host
         self._port = port
         self._timeout = timeout
+        self._client = None  # type: Optional[Any]
 
-    def _get_state(self) -> Dict:
+    def _connect(self) -> Any:
         from mpd import MPDClient
 
         client = MPDClient()
         client.timeout = self._timeout
         client.connect(self._host, self._port)
-        state = client.status()
-        client.close()
-        client.disconnect()
-        return state
+        return client
+
+    def _drop_client(self) -> None:
+        client, self._client = self._client, None
+        if client is not None:
+            try:
+                client.disconnect()
+            except Exception:  # noqa: S110
+                pass
+
+    def _get_state(self) -> Dict:
+        from mpd import MPDError
+
+        # MPD closes idle connections after a while. Therefore, a failure on a
+        # reused connection is retried once with a fresh one.
+        if self._client is not None:
+            try:
+                return self._client.status()
+            except (MPDError, OSError):
+                self.logger.debug("Reconnecting to MPD", exc_info=True)
+                self._drop_client()
+
+        self._client = self._connect()
+        try:
+            return self._client.status()
+        except Exception:
+            self._drop_client()
+            raise
 
     def check(self) -> Optional[str]:
         from mpd import MPDError
@@ -292,7 +324,7 @@ class NetworkBandwidth(Activity):
         threshold_receive: float,
     ) -> None:
         Check.__init__(self, name)
-        self._interfaces = interfaces
+        self._interfaces = tuple(interfaces)
         self._threshold_send = threshold_send
         self._threshold_receive = threshold_receive
         self._previous_values = psutil.net_io_counters(pernic=True)
@@ -310,16 +342,17 @@ class NetworkBandwidth(Activity):
         if new_time == self._previous_time:
             raise TemporaryCheckError("Called too fast, no time between calls")
         self._previous_time = new_time
+        elapsed = new_time - old_time
 
         for interface in self._interfaces:
-            if interface not in new_values or interface not in self._previous_values:
+            if interface not in new_values or interface not in old_values:
                 raise TemporaryCheckError("Interface {} is missing".format(interface))
+            new_counters = new_values[interface]
+            old_counters = old_values[interface]
 
             # send direction
-            delta_send = (
-                new_values[interface].bytes_sent - old_values[interface].bytes_sent
-            )
-            rate_send = delta_send / (new_time - old_time)
+            delta_send = new_counters.bytes_sent - old_counters.bytes_sent
+            rate_send = delta_send / elapsed
             if rate_send > self._threshold_send:
                 return (
                     "Interface {} sending rate {} byte/s "
@@ -329,10 +362,8 @@ class NetworkBandwidth(Activity):
                 )
 
             # receive direction
-            delta_receive = (
-                new_values[interface].bytes_recv - old_values[interface].bytes_recv
-            )
-            rate_receive = delta_receive / (new_time - old_time)
+            delta_receive = new_counters.bytes_recv - old_counters.bytes_recv
+            rate_receive = delta_receive / elapsed
             if rate_receive > self._threshold_receive:
                 return (
                     "Interface {} receive rate {} byte/s "
@@ -358,22 +389,76 @@ class Ping(Activity):
                 "Unable to determine hosts to ping: {}".format(error)
             ) from error
 
-    def __init__(self, name: str, hosts: Iterable[str]) -> None:
+    def __init__(self, name: str, hosts: Sequence[str]) -> None:
         Check.__init__(self, name)
         self._hosts = hosts
+        self._fping = shutil.which("fping")
+
+    def _fping_alive(self, fping: str) -> Optional[List[str]]:
+        """Probe all hosts with a single fping process.
+
+        Args:
+            fping:
+                path of the fping executable
+
+        Returns:
+            the hosts that answered or ``None`` in case fping failed
+        """
+        # exit codes 1 and 2 signal unreachable or unresolvable hosts
+        process = subprocess.run(  # noqa: S603 we know the input from the config
+            [fping, "-a", *self._hosts],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            universal_newlines=True,
+        )
+        if process.returncode not in (0, 1, 2):
+            # fping is unusable, e.g. missing permissions for ICMP sockets.
+            # Do not spawn it again in every iteration.
+            self.logger.warning(
+                "fping failed with exit code %s, using ping from now on",
+                process.returncode,
+            )
+            self._fping = None
+            return None
+        return process.stdout.split()
+
+    def _ping(self, host: str) -> bool:
+        cmd = ["ping", "-q", "-c", "1", host]
+        return (
+            subprocess.call(  # noqa: S603 we know the input from the config
+                cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            )
+            == 0
+        )
 
     def check(self) -> Optional[str]:
-        for host in self._hosts:
-            cmd = ["ping", "-q", "-c", "1", host]
-            if (
-                subprocess.call(  # noqa: S603 we know the input from the config
-                    cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
-                )
-                == 0
-            ):
-                self.logger.debug("host " + host + " appears to be up")
-                return "Host {} is up".format(host)
-        return None
+        if not self._hosts:
+            return None
+
+        if self._fping is not None:
+            alive = self._fping_alive(self._fping)
+            if alive is not None:
+                if alive:
+                    self.logger.debug("host " + alive[0] + " appears to be up")
+                    return "Host {} is up".format(alive[0])
+                return None
+
+        # Ping all hosts concurrently. Unreachable hosts block until ping
+        # times out and would otherwise add up for every configured host.
+        executor = ThreadPoolExecutor(max_workers=min(len(self._hosts), 16))
+        futures = {executor.submit(self._ping, host): host for host in self._hosts}
+        try:
+            for future in as_completed(futures):
+                if future.result():
+                    host = futures[future]
+                    self.logger.debug("host " + host + " appears to be up")
+                    return "Host {} is up".format(host)
+            return None
+        finally:
+            # do not wait for the remaining pings in case a host is up
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
 
 
 class Processes(Activity):
@@ -388,17 +473,15 @@ class Processes(Activity):
 
     def __init__(self, name: str, processes: Iterable[str]) -> None:
         Check.__init__(self, name)
-        self._processes = processes
+        self._processes = frozenset(processes)
 
     def check(self) -> Optional[str]:
-        for proc in psutil.process_iter():
-            try:
-                pinfo = proc.name()
-                for name in self._processes:
-                    if pinfo == name:
-                        return "Process {} is running".format(name)
-            except psutil.NoSuchProcess:
-                pass
+        # Only prefetch the name. psutil skips processes that have vanished
+        # meanwhile and reports None for names that cannot be accessed.
+        for proc in psutil.process_iter(["name"]):
+            name = proc.info["name"]
+            if name in self._processes:
+                return "Process {} is running".format(name)
         return None
 
 
@@ -407,30 +490,83 @@ class Smb(Activity):
     def create(cls, name: str, config: Optional[configparser.SectionProxy]) -> "Smb":
         return cls(name)
 
-    def check(self) -> Optional[str]:
-        try:
-            status_output = subprocess.check_output(  # noqa: S603, S607
-                ["smbstatus", "-b"]
-            ).decode("utf-8")
-        except subprocess.CalledProcessError as error:
-            raise SevereCheckError(error) from error
+    def __init__(self, name: str) -> None:
+        Activity.__init__(self, name)
+        # JSON output requires Samba 4.15. Disabled once smbstatus rejects it.
+        self._use_json = True
 
+    def _check_json(self) -> Optional[str]:
+        status_output = subprocess.check_output(  # noqa: S603, S607
+            ["smbstatus", "-b", "--json"], universal_newlines=True
+        )
         self.logger.debug("Received status output:\n%s", status_output)
 
-        connections = []
-        start_seen = False
-        for line in status_output.splitlines():
-            if start_seen:
-                connections.append(line)
-            else:
-                if line.startswith("----"):
-                    start_seen = True
+        sessions = json.loads(status_output).get("sessions", {})
+        if sessions:
+            return "SMB clients are connected:\n{}".format(
+                "\n".join(
+                    "{} {} {} {} ({})".format(
+                        session.get("server_id", {}).get("pid", "?"),
+                        session.get("username", "?"),
+                        session.get("groupname", "?"),
+                        session.get("remote_machine", "?"),
+                        session.get("hostname", "?"),
+                    )
+                    for session in sessions.values()
+                )
+            )
+        else:
+            return None
+
+    def _check_text(self) -> Optional[str]:
+        status_output = subprocess.check_output(["smbstatus", "-b"])  # noqa: S603, S607
+
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(
+                "Received status output:\n%s",
+                status_output.decode("utf-8", errors="replace"),
+            )
+
+        # Connections are listed below the separator line of the table header.
+        # Locate it in the raw output so that only the connections need to be
+        # decoded.
+        separator = (b"\n" + status_output).find(b"\n----")
+        if separator < 0:
+            return None
+        separator_end = status_output.find(b"\n", separator)
+        if separator_end < 0:
+            return None
+        connections = (
+            status_output[separator_end + 1 :]
+            .decode("utf-8", errors="replace")
+            .splitlines()
+        )
 
         if connections:
             return "SMB clients are connected:\n{}".format("\n".join(connections))
         else:
             return None
 
+    def check(self) -> Optional[str]:
+        if self._use_json:
+            try:
+                return self._check_json()
+            except (subprocess.CalledProcessError, ValueError, AttributeError):
+                self.logger.debug(
+                    "smbstatus does not provide JSON output", exc_info=True
+                )
+
+        try:
+            result = self._check_text()
+        except subprocess.CalledProcessError as error:
+            raise SevereCheckError(error) from error
+
+        # smbstatus works, so the JSON failure was not a temporary problem
+        if self._use_json:
+            self.logger.info("Falling back to parsing the text output of smbstatus")
+            self._use_json = False
+        return result
+
 
 class Users(Activity):
     @classmethod
@@ -458,13 +594,23 @@ class Users(Activity):
         self._user_regex = user_regex
         self._terminal_regex = terminal_regex
         self._host_regex = host_regex
+        # the default wildcard accepts every entry, skip evaluating it
+        self._matchers = tuple(
+            (attribute, regex.fullmatch)
+            for attribute, regex in (
+                ("name", user_regex),
+                ("terminal", terminal_regex),
+                ("host", host_regex),
+            )
+            if regex.pattern != r".*"
+        )
 
     def check(self) -> Optional[str]:
+        matchers = self._matchers
         for entry in psutil.users():
-            if (
-                self._user_regex.fullmatch(entry.name) is not None
-                and self._terminal_regex.fullmatch(entry.terminal) is not None
-                and self._host_regex.fullmatch(entry.host) is not None
+            if all(
+                match(getattr(entry, attribute)) is not None
+                for attribute, match in matchers
             ):
                 self.logger.debug(
                     "User %s on terminal %s from host %s " "matches criteria.",
@@ -484,6 +630,12 @@ class Users(Activity):
         return None
 
 
+@functools.lru_cache(maxsize=64)
+def _user_name_for_uid(uid: int) -> str:
+    """Resolve a user name, which requires a possibly expensive NSS lookup."""
+    return pwd.getpwuid(uid).pw_name
+
+
 class XIdleTime(Activity):
     """Check that local X display have been idle long enough."""
 
@@ -526,6 +678,25 @@ class XIdleTime(Activity):
             raise ValueError("Unknown session discovery method {}".format(method))
         self._ignore_process_re = ignore_process_re
         self._ignore_users_re = ignore_users_re
+        # the default pattern never matches, no need to scan the processes
+        self._has_ignore_process = (
+            ignore_process_re is not None and ignore_process_re.pattern != r"a^"
+        )
+        self._sockets_mtime = None  # type: Optional[int]
+        self._sockets = []  # type: List[str]
+
+    def _list_sockets(self) -> List[str]:
+        """List the X sockets, rescanning only if the directory changed."""
+        try:
+            mtime = os.stat("/tmp/.X11-unix").st_mtime_ns
+        except FileNotFoundError:
+            self._sockets_mtime = None
+            return []
+
+        if mtime != self._sockets_mtime:
+            self._sockets = glob.glob("/tmp/.X11-unix/X*")
+            self._sockets_mtime = mtime
+        return self._sockets
 
     def _list_sessions_sockets(self) -> Sequence[Tuple[int, str]]:
         """List running X sessions by iterating the X sockets.
@@ -533,7 +704,7 @@ class XIdleTime(Activity):
         This method assumes that X servers are run under the users using the
         server.
         """
-        sockets = glob.glob("/tmp/.X11-unix/X*")
+        sockets = self._list_sockets()
         self.logger.debug("Found sockets: %s", sockets)
 
         results = []
@@ -551,7 +722,7 @@ class XIdleTime(Activity):
 
             # determine the user of the display
             try:
-                user = pwd.getpwuid(os.stat(sock).st_uid).pw_name
+                user = _user_name_for_uid(os.stat(sock).st_uid)
             except (FileNotFoundError, KeyError):
                 self.logger.warning(
                     "Cannot get the owning user from socket %s. Skipping.",
@@ -595,21 +766,15 @@ class XIdleTime(Activity):
         return results
 
     def _is_skip_process_running(self, user: str) -> bool:
-        user_processes = []
-        for process in psutil.process_iter():
-            try:
-                if process.username() == user:
-                    user_processes.append(process.name())
-            except (psutil.NoSuchProcess, psutil.ZombieProcess, psutil.AccessDenied):
-                # ignore processes which have disappeared etc.
-                pass
-
-        for process in user_processes:
-            if self._ignore_process_re.match(process) is not None:
+        # inaccessible attributes of processes are reported as None
+        for process in psutil.process_iter(["username", "name"]):
+            if process.info["username"] != user or process.info["name"] is None:
+                continue
+            if self._ignore_process_re.match(process.info["name"]) is not None:
                 self.logger.debug(
                     "Process %s with pid %s matches the ignore regex '%s'."
                     " Skipping idle time check for this user.",
-                    process.name(),
+                    process.info["name"],
                     process.pid,
                     self._ignore_process_re,
                 )
@@ -617,7 +782,37 @@ class XIdleTime(Activity):
 
         return False
 
+    def _get_idle_time(self, display: int, user: str) -> float:
+        # prepare the environment for the xprintidle call
+        env = {
+            **os.environ,
+            "DISPLAY": ":{}".format(display),
+            "XAUTHORITY": os.path.join(os.path.expanduser("~" + user), ".Xauthority"),
+        }
+
+        try:
+            idle_time_output = subprocess.check_output(  # noqa: S603, S607
+                ["sudo", "-u", user, "xprintidle"], env=env
+            )
+            idle_time = float(idle_time_output.strip()) / 1000.0
+        except (subprocess.CalledProcessError, ValueError) as error:
+            self.logger.warning(
+                "Unable to determine the idle time for display %s.",
+                display,
+                exc_info=True,
+            )
+            raise TemporaryCheckError(error) from error
+
+        self.logger.debug(
+            "Idle time for display %s of user %s is %s seconds.",
+            display,
+            user,
+            idle_time,
+        )
+        return idle_time
+
     def check(self) -> Optional[str]:
+        sessions = []
         for display, user in self._provide_sessions():
             self.logger.info("Checking display %s of user %s", display, user)
 
@@ -630,43 +825,27 @@ class XIdleTime(Activity):
             # the ignore regular expression. In that case we skip idletime
             # checking because we assume the user has a process running that
             # inevitably tampers with the idle time.
-            if self._is_skip_process_running(user):
+            if self._has_ignore_process and self._is_skip_process_running(user):
                 continue
 
-            # prepare the environment for the xprintidle call
-            env = copy.deepcopy(os.environ)
-            env["DISPLAY"] = ":{}".format(display)
-            env["XAUTHORITY"] = os.path.join(
-                os.path.expanduser("~" + user), ".Xauthority"
-            )
-
-            try:
-                idle_time_output = subprocess.check_output(  # noqa: S603, S607
-                    ["sudo", "-u", user, "xprintidle"], env=env
-                )
-                idle_time = float(idle_time_output.strip()) / 1000.0
-            except (subprocess.CalledProcessError, ValueError) as error:
-                self.logger.warning(
-                    "Unable to determine the idle time for display %s.",
-                    display,
-                    exc_info=True,
-                )
-                raise TemporaryCheckError(error) from error
+            sessions.append((display, user))
 
-            self.logger.debug(
-                "Idle time for display %s of user %s is %s seconds.",
-                display,
-                user,
-                idle_time,
-            )
+        if not sessions:
+            return None
 
-            if idle_time < self._timeout:
-                return (
-                    "X session {} of user {} "
-                    "has idle time {} < threshold {}".format(
-                        display, user, idle_time, self._timeout
+        # Query all displays concurrently. Results are still evaluated in the
+        # order of the sessions, so that an error for a later display does not
+        # mask activity on an earlier one.
+        with ThreadPoolExecutor(max_workers=len(sessions)) as executor:
+            idle_times = executor.map(lambda s: self._get_idle_time(*s), sessions)
+            for (display, user), idle_time in zip(sessions, idle_times):
+                if idle_time < self._timeout:
+                    return (
+                        "X session {} of user {} "
+                        "has idle time {} < threshold {}".format(
+                            display, user, idle_time, self._timeout
+                        )
                     )
-                )
 
         return None
 
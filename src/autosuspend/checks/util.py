@@ -5,6 +5,7 @@ from . import Check, ConfigurationError, SevereCheckError, TemporaryCheckError
 
 
 if TYPE_CHECKING:
+    import requests
     import requests.model
 
 
@@ -54,6 +55,30 @@ class NetworkMixin:
         self._timeout = timeout
         self._username = username
         self._password = password
+        self._session = None  # type: Optional[requests.Session]
+
+    def _get_session(self) -> "requests.Session":
+        """Return the session of this check, creating it on first use.
+
+        The session is kept so that connections to the server are reused
+        across check iterations.
+        """
+        if self._session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            session = requests.Session()
+            # a check only ever talks to a single server, one at a time
+            for prefix in ("http://", "https://"):
+                session.mount(prefix, HTTPAdapter(pool_connections=1, pool_maxsize=1))
+            try:
+                from requests_file import FileAdapter
+
+                session.mount("file://", FileAdapter())
+            except ImportError:
+                pass
+            self._session = session
+        return self._session
 
     def request(self) -> "requests.model.Response":
         import requests
@@ -65,13 +90,7 @@ class NetworkMixin:
             "digest": HTTPDigestAuth,
         }
 
-        session = requests.Session()
-        try:
-            from requests_file import FileAdapter
-
-            session.mount("file://", FileAdapter())
-        except ImportError:
-            pass
+        session = self._get_session()
 
         try:
             reply = session.get(self._url, timeout=self._timeout)
@@ -96,18 +115,9 @@ class NetworkMixin:
 class XPathMixin(NetworkMixin):
     @classmethod
     def collect_init_args(cls, config: configparser.SectionProxy) -> Dict[str, Any]:
-        from lxml.etree import XPath, XPathSyntaxError  # noqa: S410 our input
-
         try:
             args = NetworkMixin.collect_init_args(config)
             args["xpath"] = config["xpath"].strip()
-            # validate the expression
-            try:
-                XPath(args["xpath"])
-            except XPathSyntaxError as error:
-                raise ConfigurationError(
-                    "Invalid xpath expression: " + args["xpath"]
-                ) from error
             return args
         except KeyError as error:
             raise ConfigurationError("Lacks " + str(error) + " config entry") from error
@@ -121,18 +131,20 @@ class XPathMixin(NetworkMixin):
         self._xpath = xpath
         from lxml import etree  # noqa: S410 required flag set
 
+        # compile once, validating the expression on the way
+        try:
+            self._compiled_xpath = etree.XPath(xpath)
+        except etree.XPathSyntaxError as error:
+            raise ConfigurationError("Invalid xpath expression: " + xpath) from error
         self._parser = etree.XMLParser(resolve_entities=False)
 
     def evaluate(self) -> Sequence[Any]:
-        import requests
-        import requests.exceptions
         from lxml import etree  # noqa: S410 using safe parser
 
+        # request errors are already converted to TemporaryCheckError
+        reply = self.request().content
         try:
-            reply = self.request().content
             root = etree.fromstring(reply, parser=self._parser)  # noqa: S320
-            return root.xpath(self._xpath)
-        except requests.exceptions.RequestException as error:
-            raise TemporaryCheckError(error) from error
+            return self._compiled_xpath(root)
         except etree.XMLSyntaxError as error:
             raise TemporaryCheckError(error) from error
@@ -57,7 +57,7 @@ class File(Wakeup):
         try:
             with open(self._path, "r") as time_file:
                 return datetime.fromtimestamp(
-                    float(time_file.readlines()[0].strip()), timezone.utc
+                    float(time_file.readline().strip()), timezone.utc
                 )
         except FileNotFoundError:
             # this is ok
@@ -80,8 +80,8 @@ class Command(CommandMixin, Wakeup):
     def check(self, timestamp: datetime) -> Optional[datetime]:
         try:
             output = subprocess.check_output(
-                self._command, shell=True,  # noqa: S602
-            ).splitlines()[0]
+                self._command, shell=True, universal_newlines=True,  # noqa: S602
+            ).split("\n", 1)[0]
             self.logger.debug(
                 "Command %s succeeded with output %s", self._command, output
             )
@@ -171,8 +171,7 @@ class XPathDelta(XPath):
             raise ValueError("Unsupported unit")
         XPath.__init__(self, name, **kwargs)
         self._unit = unit
+        self._unit_delta = timedelta(**{unit: 1})  # type: ignore
 
     def convert_result(self, result: str, timestamp: datetime) -> datetime:
-        kwargs = {}
-        kwargs[self._unit] = float(result)
-        return timestamp + timedelta(**kwargs)  # type: ignore
+        return timestamp + float(result) * self._unit_delta
@@ -1,10 +1,19 @@
-from typing import Iterable, Tuple, TYPE_CHECKING
+import threading
+import time
+from typing import Iterable, List, Optional, Tuple, TYPE_CHECKING
 
 
 if TYPE_CHECKING:
     import dbus
 
 
+# Several checks query the logind sessions in the same iteration. Results are
+# shared between them for this amount of seconds.
+_SESSIONS_CACHE_TTL = 1.0
+_sessions_cache = None  # type: Optional[Tuple[float, List[Tuple[str, dict]]]]
+_sessions_lock = threading.Lock()
+
+
 def _get_bus() -> "dbus.SystemBus":
     import dbus
 
@@ -14,11 +23,29 @@ def _get_bus() -> "dbus.SystemBus":
 def list_logind_sessions() -> Iterable[Tuple[str, dict]]:
     """List running logind sessions and their properties.
 
+    Results are cached for a short time so that checks executed in the same
+    iteration do not all query logind.
+
     Returns:
         list of (session_id, properties dict):
             A list with tuples of sessions ids and their associated properties
             represented as dicts.
     """
+    global _sessions_cache
+
+    with _sessions_lock:
+        now = time.monotonic()
+        if _sessions_cache is not None:
+            timestamp, sessions = _sessions_cache
+            if now - timestamp < _SESSIONS_CACHE_TTL:
+                return sessions
+
+        sessions = _query_logind_sessions()
+        _sessions_cache = (now, sessions)
+        return sessions
+
+
+def _query_logind_sessions() -> List[Tuple[str, dict]]:
     import dbus
 
     bus = _get_bus()
@@ -76,6 +76,8 @@ def logind(monkeypatch):
         return test_case.get_dbus(system_bus=True)
 
     monkeypatch.setattr(util_systemd, "_get_bus", get_bus)
+    # sessions are modified by the tests, always query the mock
+    monkeypatch.setattr(util_systemd, "_SESSIONS_CACHE_TTL", 0)
 
     yield obj
 
@@ -2,7 +2,10 @@ import argparse
 import configparser
 from datetime import datetime, timedelta, timezone
 import logging
+import os
 import subprocess
+import threading
+import time
 
 import dateutil.parser
 import pytest
@@ -50,6 +53,12 @@ class TestScheduleWakeup:
         mock.assert_called_once_with("foo", shell=True)
         assert spy.call_count == 1
 
+    def test_unknown_placeholder(self, mocker) -> None:
+        mocker.patch("subprocess.check_call")
+
+        with pytest.raises(KeyError):
+            autosuspend.schedule_wakeup("echo {foo}", datetime.now(timezone.utc))
+
 
 class TestConfigureLogging:
     def test_debug(self, mocker) -> None:
@@ -252,22 +261,46 @@ class TestExecuteChecks:
         )
         matching_check.check.assert_called_once_with()
 
-    def test_only_first_called(self, mocker) -> None:
+    def test_only_first_reported(self, mocker) -> None:
         matching_check = mocker.MagicMock(spec=autosuspend.Activity)
         matching_check.name = "foo"
         matching_check.check.return_value = "matches"
         second_check = mocker.MagicMock()
         second_check.name = "bar"
         second_check.check.return_value = "matches"
+        logger = mocker.MagicMock()
 
         assert (
-            autosuspend.execute_checks(
-                [matching_check, second_check], False, mocker.MagicMock()
-            )
+            autosuspend.execute_checks([matching_check, second_check], False, logger)
             is True
         )
+        # checks run in parallel, hence all of them are executed
         matching_check.check.assert_called_once_with()
-        second_check.check.assert_not_called()
+        second_check.check.assert_called_once_with()
+        assert logger.info.call_count == 1
+
+    def test_all_reported(self, mocker) -> None:
+        matching_check = mocker.MagicMock(spec=autosuspend.Activity)
+        matching_check.name = "foo"
+        matching_check.check.return_value = "matches"
+        second_check = mocker.MagicMock()
+        second_check.name = "bar"
+        second_check.check.return_value = "matches"
+        logger = mocker.MagicMock()
+
+        assert (
+            autosuspend.execute_checks([matching_check, second_check], True, logger)
+            is True
+        )
+        assert logger.info.call_count == 2
+
+    def test_no_match(self, mocker) -> None:
+        check = mocker.MagicMock(spec=autosuspend.Activity)
+        check.name = "foo"
+        check.check.return_value = None
+
+        assert autosuspend.execute_checks([check], False, mocker.MagicMock()) is False
+        check.check.assert_called_once_with()
 
     def test_all_called(self, mocker) -> None:
         matching_check = mocker.MagicMock(spec=autosuspend.Activity)
@@ -434,6 +467,85 @@ class TestNotifySuspend:
             assert "suitable" in caplog.text
 
 
+class TestReloadConfig:
+    def test_modified(self, tmp_path) -> None:
+        config_file = tmp_path / "test.conf"
+        config_file.write_text("[general]\ninterval = 42\n")
+
+        config, modified = autosuspend.reload_config(str(config_file), None)
+
+        assert config is not None
+        assert config.getint("general", "interval") == 42
+        assert modified == config_file.stat().st_mtime
+
+    def test_unchanged(self, tmp_path) -> None:
+        config_file = tmp_path / "test.conf"
+        config_file.write_text("[general]\n")
+        modified = config_file.stat().st_mtime
+
+        assert autosuspend.reload_config(str(config_file), modified) == (
+            None,
+            modified,
+        )
+
+    def test_missing_file(self, tmp_path) -> None:
+        with pytest.raises(OSError):
+            autosuspend.reload_config(str(tmp_path / "missing.conf"), None)
+
+
+class TestSleep:
+    @pytest.fixture()
+    def pipe(self):
+        read_fd, write_fd = os.pipe()
+        os.set_blocking(read_fd, False)
+        yield read_fd, write_fd
+        os.close(read_fd)
+        os.close(write_fd)
+
+    def test_without_fd(self, mocker) -> None:
+        mock = mocker.patch("time.sleep")
+        autosuspend._sleep(42)
+        mock.assert_called_once_with(42)
+
+    def test_interrupted(self, pipe) -> None:
+        read_fd, write_fd = pipe
+        os.write(write_fd, b"\0\0")
+
+        start = time.monotonic()
+        autosuspend._sleep(10, read_fd)
+        assert time.monotonic() - start < 5
+
+        # data has been consumed
+        with pytest.raises(BlockingIOError):
+            os.read(read_fd, 1)
+
+    def test_timeout(self, pipe) -> None:
+        read_fd, _ = pipe
+
+        start = time.monotonic()
+        autosuspend._sleep(0.05, read_fd)
+        assert time.monotonic() - start >= 0.05
+
+
+class TestLoop:
+    def test_leaves_when_reload_requested(self, mocker, tmp_path) -> None:
+        processor = mocker.MagicMock(spec=autosuspend.Processor)
+        reload_requested = threading.Event()
+        reload_requested.set()
+
+        autosuspend.loop(
+            processor,
+            1,
+            None,
+            str(tmp_path / "woke_up"),
+            str(tmp_path / "lock"),
+            1,
+            reload_requested=reload_requested,
+        )
+
+        processor.iteration.assert_not_called()
+
+
 class TestConfigureProcessor:
     def test_minimal_config(self, mocker) -> None:
         parser = configparser.ConfigParser()
@@ -447,9 +559,9 @@ class TestConfigureProcessor:
         args = mocker.MagicMock(spec=argparse.Namespace)
         type(args).all_checks = mocker.PropertyMock(return_value=True)
         processor = autosuspend.configure_processor(args, parser, [], [])
-        assert processor._idle_time == 300
-        assert processor._min_sleep_time == 1200
-        assert processor._wakeup_delta == 30
+        assert processor._idle_time == timedelta(seconds=300)
+        assert processor._min_sleep_time == timedelta(seconds=1200)
+        assert processor._wakeup_delta == timedelta(seconds=30)
         assert processor._all_activities
 
 
@@ -32,6 +32,7 @@ from autosuspend.checks.activity import (
     Users,
     XIdleTime,
     XPath,
+    _user_name_for_uid,
 )
 from . import CheckTest
 
@@ -70,6 +71,43 @@ class TestSmb(CheckTest):
         with pytest.raises(SevereCheckError):
             Smb("foo").check()
 
+    def test_json_with_connections(self, datadir, mocker) -> None:
+        mock = mocker.patch("subprocess.check_output")
+        mock.return_value = (datadir / "smbstatus_with_connections.json").read_text()
+
+        res = Smb("foo").check()
+        assert res is not None
+        assert len(res.splitlines()) == 3
+        assert "buser" in res
+        mock.assert_called_once_with(
+            ["smbstatus", "-b", "--json"], universal_newlines=True
+        )
+
+    def test_json_no_connections(self, datadir, mocker) -> None:
+        mock = mocker.patch("subprocess.check_output")
+        mock.return_value = (datadir / "smbstatus_no_connections.json").read_text()
+
+        assert Smb("foo").check() is None
+
+    def test_json_unsupported_falls_back(self, datadir, mocker) -> None:
+        def check_output(args, **kwargs):
+            if "--json" in args:
+                raise subprocess.CalledProcessError(1, args)
+            return (datadir / "smbstatus_with_connections").read_bytes()
+
+        mock = mocker.patch("subprocess.check_output", side_effect=check_output)
+
+        check = Smb("foo")
+        assert check.check() is not None
+        assert check.check() is not None
+
+        # JSON output is only tried once
+        assert [call[0][0] for call in mock.call_args_list] == [
+            ["smbstatus", "-b", "--json"],
+            ["smbstatus", "-b"],
+            ["smbstatus", "-b"],
+        ]
+
     def test_create(self) -> None:
         assert isinstance(Smb.create("name", None), Smb)
 
@@ -120,6 +158,19 @@ class TestUsers(CheckTest):
             is None
         )
 
+    def test_wildcard_matches_without_host(self, monkeypatch) -> None:
+        def data():
+            return [self.create_suser("foo", "pts1", None, 12345, 12345)]
+
+        monkeypatch.setattr(psutil, "users", data)
+
+        assert (
+            Users(
+                "users", re.compile("foo"), re.compile(".*"), re.compile(".*")
+            ).check()
+            is not None
+        )
+
     def test_create(self) -> None:
         parser = configparser.ConfigParser()
         parser.read_string(
@@ -158,33 +209,27 @@ class TestProcesses(CheckTest):
 
     class StubProcess:
         def __init__(self, name):
-            self._name = name
-
-        def name(self):
-            return self._name
-
-    class RaisingProcess:
-        def name(self):
-            raise psutil.NoSuchProcess(42)
+            self.info = {"name": name}
 
     def test_matching_process(self, monkeypatch) -> None:
-        def data():
+        def data(attrs):
+            assert attrs == ["name"]
             return [self.StubProcess("blubb"), self.StubProcess("nonmatching")]
 
         monkeypatch.setattr(psutil, "process_iter", data)
 
         assert Processes("foo", ["dummy", "blubb", "other"]).check() is not None
 
-    def test_ignore_no_such_process(self, monkeypatch) -> None:
-        def data():
-            return [self.RaisingProcess()]
+    def test_ignore_inaccessible_name(self, monkeypatch) -> None:
+        def data(attrs):
+            return [self.StubProcess(None)]
 
         monkeypatch.setattr(psutil, "process_iter", data)
 
-        Processes("foo", ["dummy"]).check()
+        assert Processes("foo", ["dummy"]).check() is None
 
     def test_non_matching_process(self, monkeypatch) -> None:
-        def data():
+        def data(attrs):
             return [self.StubProcess("asdfasdf"), self.StubProcess("nonmatching")]
 
         monkeypatch.setattr(psutil, "process_iter", data)
@@ -199,11 +244,11 @@ class TestProcesses(CheckTest):
             processes = foo, bar, narf
             """
         )
-        assert Processes.create("name", parser["section"])._processes == [
+        assert Processes.create("name", parser["section"])._processes == {
             "foo",
             "bar",
             "narf",
-        ]
+        }
 
     def test_create_no_entry(self) -> None:
         parser = configparser.ConfigParser()
@@ -338,7 +383,8 @@ class TestActiveConnection(CheckTest):
                 ],
             }
 
-        def connections():
+        def connections(kind):
+            assert kind == "tcp"
             return [connection]
 
         monkeypatch.setattr(psutil, "net_if_addrs", addresses)
@@ -399,7 +445,7 @@ class TestActiveConnection(CheckTest):
                 ]
             }
 
-        def connections():
+        def connections(kind):
             return [connection]
 
         monkeypatch.setattr(psutil, "net_if_addrs", addresses)
@@ -523,13 +569,46 @@ class TestMpd(CheckTest):
         port = 42
         timeout = 17
 
-        assert Mpd("name", host, port, timeout).check() is not None
+        check = Mpd("name", host, port, timeout)
+        assert check.check() is not None
+        assert check.check() is not None
 
         timeout_property.assert_called_once_with(timeout)
         mock_instance.connect.assert_called_once_with(host, port)
-        mock_instance.status.assert_called_once_with()
-        mock_instance.close.assert_called_once_with()
+        assert mock_instance.status.call_count == 2
+        mock_instance.disconnect.assert_not_called()
+
+    def test_reconnects_stale_connection(self, mocker) -> None:
+        import mpd
+
+        stale = mocker.MagicMock(spec=mpd.MPDClient)
+        stale.status.side_effect = mpd.ConnectionError("Connection lost")
+        fresh = mocker.MagicMock(spec=mpd.MPDClient)
+        fresh.status.return_value = {"state": "play"}
+        mocker.patch("mpd.MPDClient", side_effect=[stale, fresh])
+
+        check = Mpd("name", "foo", 42, 17)
+        check._client = check._connect()
+
+        assert check.check() is not None
+
+        stale.disconnect.assert_called_once_with()
+        fresh.connect.assert_called_once_with("foo", 42)
+        assert check._client is fresh
+
+    def test_drops_client_on_error(self, mocker) -> None:
+        import mpd
+
+        mock_instance = mocker.MagicMock(spec=mpd.MPDClient)
+        mock_instance.status.side_effect = mpd.ConnectionError()
+        mocker.patch("mpd.MPDClient", return_value=mock_instance)
+
+        check = Mpd("name", "foo", 42, 17)
+        with pytest.raises(TemporaryCheckError):
+            check.check()
+
         mock_instance.disconnect.assert_called_once_with()
+        assert check._client is None
 
     @pytest.mark.parametrize("exception_type", [ConnectionError, mpd.ConnectionError])
     def test_handle_connection_errors(self, exception_type) -> None:
@@ -772,6 +851,23 @@ threshold_receive = xxx
             assert res is not None
             assert " 100.0 " in res
 
+    def test_interface_appeared(self, mocker) -> None:
+        mocker.patch("psutil.net_io_counters").return_value = {}
+
+        with freeze_time("2019-10-01 10:00:00"):
+            check = NetworkBandwidth("name", ["eth0"], 0, 0)
+
+        counters = mocker.MagicMock()
+        type(counters).bytes_sent = mocker.PropertyMock(return_value=1222)
+        type(counters).bytes_recv = mocker.PropertyMock(return_value=900)
+        mocker.patch("psutil.net_io_counters").return_value = {
+            "eth0": counters,
+        }
+
+        with freeze_time("2019-10-01 10:00:01"):
+            with pytest.raises(TemporaryCheckError):
+                check.check()
+
 
 class TestKodi(CheckTest):
     def create_instance(self, name):
@@ -1033,6 +1129,10 @@ class TestKodiIdleTime(CheckTest):
 
 
 class TestPing(CheckTest):
+    @pytest.fixture(autouse=True)
+    def no_fping(self, mocker) -> None:
+        mocker.patch("shutil.which", return_value=None)
+
     def create_instance(self, name):
         return Ping(name, "8.8.8.8")
 
@@ -1045,14 +1145,64 @@ class TestPing(CheckTest):
         assert Ping("name", hosts).check() is None
 
         assert mock.call_count == len(hosts)
-        for (args, _), host in zip(mock.call_args_list, hosts):
-            assert args[0][-1] == host
+        # hosts are pinged concurrently, hence the call order is undefined
+        assert {args[0][-1] for args, _ in mock.call_args_list} == set(hosts)
 
     def test_matching(self, mocker) -> None:
         mock = mocker.patch("subprocess.call")
         mock.return_value = 0
         assert Ping("name", ["foo"]).check() is not None
 
+    def test_matching_among_unreachable(self, mocker) -> None:
+        mock = mocker.patch("subprocess.call")
+        mock.side_effect = lambda cmd, **kwargs: 0 if cmd[-1] == "up" else 1
+
+        res = Ping("name", ["down", "up", "other"]).check()
+
+        assert res is not None
+        assert "up" in res
+
+    def test_no_hosts(self, mocker) -> None:
+        mock = mocker.patch("subprocess.call")
+        assert Ping("name", []).check() is None
+        mock.assert_not_called()
+
+    def test_fping_matching(self, mocker) -> None:
+        mocker.patch("shutil.which", return_value="/usr/bin/fping")
+        mock = mocker.patch("subprocess.run")
+        mock.return_value = subprocess.CompletedProcess([], 1, stdout="up\n")
+        call_mock = mocker.patch("subprocess.call")
+
+        res = Ping("name", ["down", "up"]).check()
+
+        assert res is not None
+        assert "up" in res
+        args, _ = mock.call_args
+        assert args[0] == ["/usr/bin/fping", "-a", "down", "up"]
+        call_mock.assert_not_called()
+
+    def test_fping_not_matching(self, mocker) -> None:
+        mocker.patch("shutil.which", return_value="/usr/bin/fping")
+        mock = mocker.patch("subprocess.run")
+        mock.return_value = subprocess.CompletedProcess([], 2, stdout="")
+
+        assert Ping("name", ["down", "unknown"]).check() is None
+
+    def test_fping_error_falls_back(self, mocker) -> None:
+        mocker.patch("shutil.which", return_value="/usr/bin/fping")
+        mock = mocker.patch("subprocess.run")
+        mock.return_value = subprocess.CompletedProcess([], 4, stdout="")
+        call_mock = mocker.patch("subprocess.call")
+        call_mock.return_value = 0
+
+        ping = Ping("name", ["up"])
+        assert ping.check() is not None
+        call_mock.assert_called_once()
+
+        assert ping.check() is not None
+        mock.assert_called_once()
+        assert call_mock.call_count == 2
+
     def test_create_missing_hosts(self) -> None:
         parser = configparser.ConfigParser()
         parser.read_string("""[section]""")
@@ -1110,23 +1260,88 @@ class TestXIdleTime(CheckTest):
             ("17", "otheruser"),
         ]
 
+        idle_times = {":42": "120000", ":17": "123"}
         co_mock = mocker.patch("subprocess.check_output")
-        co_mock.side_effect = [
-            "120000",
-            "123",
-        ]
+        co_mock.side_effect = lambda args, env: idle_times[env["DISPLAY"]]
 
         res = check.check()
         assert res is not None
         assert " 0.123 " in res
 
         assert co_mock.call_count == 2
-        # check second call for correct values, not checked before
-        args, kwargs = co_mock.call_args_list[1]
-        assert "otheruser" in args[0]
+        # check call of the second session for correct values
+        (args,), kwargs = next(
+            call for call in co_mock.call_args_list if "otheruser" in call[0][0]
+        )
         assert kwargs["env"]["DISPLAY"] == ":17"
         assert "otheruser" in kwargs["env"]["XAUTHORITY"]
 
+    def test_error_after_active_session_ignored(self, mocker) -> None:
+        check = XIdleTime("name", 100, "logind", re.compile(r"a^"), re.compile(r"a^"))
+        mocker.patch.object(check, "_provide_sessions").return_value = [
+            ("42", "auser"),
+            ("17", "otheruser"),
+        ]
+
+        def check_output(args, env):
+            if env["DISPLAY"] == ":17":
+                raise subprocess.CalledProcessError(2, "foo")
+            return "123"
+
+        mocker.patch("subprocess.check_output").side_effect = check_output
+
+        res = check.check()
+        assert res is not None
+        assert "auser" in res
+
+    def test_default_ignore_process_skips_scan(self, mocker) -> None:
+        check = XIdleTime("name", 100, "logind", re.compile(r"a^"), re.compile(r"a^"))
+        mocker.patch.object(check, "_provide_sessions").return_value = [
+            ("42", "auser"),
+        ]
+        mocker.patch("subprocess.check_output").return_value = "123"
+        iter_mock = mocker.patch("psutil.process_iter")
+
+        assert check.check() is not None
+        iter_mock.assert_not_called()
+
+    def test_ignore_process(self, mocker) -> None:
+        check = XIdleTime(
+            "name", 100, "logind", re.compile(r"ignore.*"), re.compile(r"a^")
+        )
+        mocker.patch.object(check, "_provide_sessions").return_value = [
+            ("42", "auser"),
+        ]
+        co_mock = mocker.patch("subprocess.check_output")
+        co_mock.return_value = "123"
+
+        Process = namedtuple("Process", ["info", "pid"])
+        mocker.patch("psutil.process_iter").return_value = [
+            Process({"username": "otheruser", "name": "ignoreme"}, 1),
+            Process({"username": "auser", "name": None}, 2),
+            Process({"username": "auser", "name": "ignoreme"}, 3),
+        ]
+
+        assert check.check() is None
+        co_mock.assert_not_called()
+
+    def test_ignore_process_other_user(self, mocker) -> None:
+        check = XIdleTime(
+            "name", 100, "logind", re.compile(r"ignore.*"), re.compile(r"a^")
+        )
+        mocker.patch.object(check, "_provide_sessions").return_value = [
+            ("42", "auser"),
+        ]
+        mocker.patch("subprocess.check_output").return_value = "123"
+
+        Process = namedtuple("Process", ["info", "pid"])
+        mocker.patch("psutil.process_iter").return_value = [
+            Process({"username": "otheruser", "name": "ignoreme"}, 1),
+            Process({"username": "auser", "name": "other"}, 2),
+        ]
+
+        assert check.check() is not None
+
     def test_handle_call_error(self, mocker) -> None:
         check = XIdleTime("name", 100, "logind", re.compile(r"a^"), re.compile(r"a^"))
         mocker.patch.object(check, "_provide_sessions").return_value = [
@@ -1239,6 +1454,7 @@ class TestXIdleTime(CheckTest):
 
         mock_pwd = mocker.patch("pwd.getpwuid")
         mock_pwd.return_value = this_user
+        _user_name_for_uid.cache_clear()
 
         parser = configparser.ConfigParser()
         parser.read_string("""[section]""")
@@ -1248,6 +1464,43 @@ class TestXIdleTime(CheckTest):
             (42, this_user.pw_name),
         ]
 
+        # user names are resolved only once per uid
+        assert check._list_sessions_sockets() == [
+            (0, this_user.pw_name),
+            (42, this_user.pw_name),
+        ]
+        mock_pwd.assert_called_once_with(stat_return.st_uid)
+
+    def test_list_sockets_cached(self, mocker) -> None:
+        mock_glob = mocker.patch("glob.glob")
+        mock_glob.return_value = ["/tmp/.X11-unix/X0"]
+        mock_stat = mocker.patch("os.stat")
+        mock_stat.return_value.st_mtime_ns = 1
+
+        parser = configparser.ConfigParser()
+        parser.read_string("""[section]""")
+        check = XIdleTime.create("name", parser["section"])
+
+        assert check._list_sockets() == ["/tmp/.X11-unix/X0"]
+        assert check._list_sockets() == ["/tmp/.X11-unix/X0"]
+        mock_glob.assert_called_once_with("/tmp/.X11-unix/X*")
+
+        mock_stat.return_value.st_mtime_ns = 2
+        mock_glob.return_value = []
+        assert check._list_sockets() == []
+        assert mock_glob.call_count == 2
+
+    def test_list_sockets_no_directory(self, mocker) -> None:
+        mocker.patch("os.stat", side_effect=FileNotFoundError())
+        mock_glob = mocker.patch("glob.glob")
+
+        parser = configparser.ConfigParser()
+        parser.read_string("""[section]""")
+        check = XIdleTime.create("name", parser["section"])
+
+        assert check._list_sockets() == []
+        mock_glob.assert_not_called()
+
 
 class TestExternalCommand(CheckTest):
     def create_instance(self, name):
@@ -142,6 +142,24 @@ class TestNetworkMixin:
     def test_file_url(self) -> None:
         NetworkMixin("file://" + __file__, 5).request()
 
+    def test_session_reused(self, httpserver) -> None:
+        httpserver.expect_request("/data").respond_with_data("iamhere")
+        check = NetworkMixin(httpserver.url_for("/data"), timeout=5)
+
+        assert check.request().text == "iamhere"
+        session = check._session
+        assert session is not None
+
+        assert check.request().text == "iamhere"
+        assert check._session is session
+
+    def test_session_pool_bounded(self) -> None:
+        session = NetworkMixin("http://localhost", timeout=5)._get_session()
+        for prefix in ("http://", "https://"):
+            adapter = session.get_adapter(prefix)
+            assert adapter._pool_connections == 1
+            assert adapter._pool_maxsize == 1
+
 
 class _XPathMixinSub(XPathMixin, Activity):
     def __init__(self, name, **kwargs):
@@ -196,6 +214,10 @@ class TestXPathMixin:
             )
             _XPathMixinSub.create("name", parser["section"])
 
+    def test_invalid_xpath_init(self) -> None:
+        with pytest.raises(ConfigurationError, match=r"^Invalid xpath.*"):
+            _XPathMixinSub("foo", xpath="|34/ad", url="nourl", timeout=5)
+
     @pytest.mark.parametrize("entry", ["xpath", "url"])
     def test_missing_config_entry(self, entry) -> None:
         with pytest.raises(ConfigurationError, match=r"^Lacks '" + entry + "'.*"):
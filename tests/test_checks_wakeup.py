@@ -144,6 +144,12 @@ class TestFile(CheckTest):
         with pytest.raises(TemporaryCheckError):
             File("name", str(file_path)).check(datetime.now(timezone.utc))
 
+    def test_empty_file(self, tmpdir) -> None:
+        test_file = tmpdir.join("file")
+        test_file.write("")
+        with pytest.raises(TemporaryCheckError):
+            File("name", str(test_file)).check(datetime.now(timezone.utc))
+
     def test_invalid_number(self, tmpdir) -> None:
         test_file = tmpdir.join("filexxx")
         test_file.write("nonumber\n\n")
@@ -165,6 +171,10 @@ class TestCommand(CheckTest):
         check = Command("test", "echo")
         assert check.check(datetime.now(timezone.utc)) is None
 
+    def test_empty_output(self) -> None:
+        check = Command("test", "true")
+        assert check.check(datetime.now(timezone.utc)) is None
+
     def test_not_parseable(self) -> None:
         check = Command("test", "echo asdfasdf")
         with pytest.raises(TemporaryCheckError):
@@ -2,6 +2,7 @@ import datetime
 import logging
 import os
 import os.path
+import signal
 
 from freezegun import freeze_time
 import pytest
@@ -33,8 +34,8 @@ def configure_config(config, datadir, tmpdir):
 @pytest.fixture()
 def rapid_sleep(mocker):
     with freeze_time() as frozen_time:
-        sleep_mock = mocker.patch("time.sleep")
-        sleep_mock.side_effect = lambda seconds: frozen_time.tick(
+        sleep_mock = mocker.patch("autosuspend._sleep")
+        sleep_mock.side_effect = lambda seconds, wakeup_fd=None: frozen_time.tick(
             datetime.timedelta(seconds=seconds)
         )
         yield frozen_time
@@ -207,6 +208,105 @@ def test_loop_defaults(tmpdir, datadir, mocker) -> None:
     assert kwargs["woke_up_file"] == ("/var/run/autosuspend-just-woke-up")
 
 
+def _request_reload_once(loop, modify=None):
+    def side_effect(*args, **kwargs):
+        if loop.call_count == 1:
+            if modify:
+                modify()
+            os.kill(os.getpid(), signal.SIGHUP)
+
+    return side_effect
+
+
+def test_reload_unchanged_config(tmpdir, datadir, mocker) -> None:
+    loop = mocker.patch("autosuspend.loop")
+    loop.side_effect = _request_reload_once(loop)
+
+    autosuspend.main(
+        [
+            "-c",
+            configure_config("minimal.conf", datadir, tmpdir).strpath,
+            "-d",
+            "daemon",
+            "-r",
+            "10",
+        ]
+    )
+
+    assert loop.call_count == 2
+    # the processor and hence its state is preserved
+    assert loop.call_args_list[0][0][0] is loop.call_args_list[1][0][0]
+
+
+def test_reload_modified_config(tmpdir, datadir, mocker) -> None:
+    config = configure_config("minimal.conf", datadir, tmpdir)
+
+    def modify():
+        config.write(config.read().replace("[general]", "[general]\ninterval = 42"))
+        os.utime(config.strpath, (0, 0))
+
+    loop = mocker.patch("autosuspend.loop")
+    loop.side_effect = _request_reload_once(loop, modify)
+
+    autosuspend.main(["-c", config.strpath, "-d", "daemon", "-r", "10"])
+
+    assert loop.call_count == 2
+    assert loop.call_args_list[0][0][0] is not loop.call_args_list[1][0][0]
+    assert loop.call_args_list[1][0][1] == 42
+
+
+def test_reload_restores_previous_handler(tmpdir, datadir, mocker) -> None:
+    def handler(signum, frame):
+        pass
+
+    previous = signal.signal(signal.SIGHUP, handler)
+    try:
+        mocker.patch("autosuspend.loop")
+
+        autosuspend.main(
+            [
+                "-c",
+                configure_config("minimal.conf", datadir, tmpdir).strpath,
+                "-d",
+                "daemon",
+                "-r",
+                "10",
+            ]
+        )
+
+        assert signal.getsignal(signal.SIGHUP) is handler
+    finally:
+        signal.signal(signal.SIGHUP, previous)
+
+
+@pytest.mark.parametrize(
+    "broken_content",
+    [
+        "broken",
+        (
+            "[general]\nidle_time = abc\n\n"
+            "[check.ExternalCommand]\nenabled = True\ncommand = false\n"
+        ),
+    ],
+)
+def test_reload_broken_config_keeps_previous(
+    tmpdir, datadir, mocker, broken_content
+) -> None:
+    config = configure_config("minimal.conf", datadir, tmpdir)
+
+    def modify():
+        config.write(broken_content)
+        os.utime(config.strpath, (0, 0))
+
+    loop = mocker.patch("autosuspend.loop")
+    loop.side_effect = _request_reload_once(loop, modify)
+
+    autosuspend.main(["-c", config.strpath, "-d", "daemon", "-r", "10"])
+
+    assert loop.call_count == 2
+    assert loop.call_args_list[0][0][0] is loop.call_args_list[1][0][0]
+
+
 def test_hook_success(tmpdir, datadir):
     autosuspend.main(
         [
@@ -1,3 +1,4 @@
+from autosuspend.util import systemd as util_systemd
 from autosuspend.util.systemd import list_logind_sessions
 
 
@@ -8,3 +9,19 @@ def test_list_logind_sessions_empty(logind) -> None:
     sessions = list(list_logind_sessions())
     assert len(sessions) == 1
     assert sessions[0][0] == "c1"
+
+
+def test_list_logind_sessions_cached(mocker, monkeypatch) -> None:
+    monkeypatch.setattr(util_systemd, "_sessions_cache", None)
+    query = mocker.patch(
+        "autosuspend.util.systemd._query_logind_sessions",
+        side_effect=[[("c1", {})], [("c2", {})]],
+    )
+    mocker.patch("time.monotonic", side_effect=[10.0, 10.5, 11.5])
+
+    assert list(list_logind_sessions()) == [("c1", {})]
+    assert list(list_logind_sessions()) == [("c1", {})]
+    assert query.call_count == 1
+
+    assert list(list_logind_sessions()) == [("c2", {})]
+    assert query.call_count == 2